@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Course, Meme, Question, Answer, QuizAttempt
+from django.utils import timezone
+from .models import Course, Meme, Question, Answer, QuizAttempt, BackgroundJob
 
 class AnswerInline(admin.TabularInline):
     model = Answer
@@ -23,4 +24,25 @@ class MemeAdmin(admin.ModelAdmin):
 @admin.register(QuizAttempt)
 class QuizAttemptAdmin(admin.ModelAdmin):
     list_display = ['user', 'score', 'total_questions', 'category', 'completed_at']
-    list_filter = ['category', 'completed_at']
\ No newline at end of file
+    list_filter = ['category', 'completed_at']
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'max_attempts', 'result', 'run_after', 'created_at', 'finished_at']
+    list_filter = ['status', 'name']
+    readonly_fields = ['name', 'payload', 'status', 'attempts', 'result', 'last_error',
+                       'locked_at', 'created_at', 'finished_at']
+    actions = ['retry_jobs']
+
+    @admin.action(description='Reîncearcă job-urile selectate')
+    def retry_jobs(self, request, queryset):
+        updated = queryset.exclude(status=BackgroundJob.STATUS_RUNNING).update(
+            status=BackgroundJob.STATUS_PENDING,
+            attempts=0,
+            run_after=timezone.now(),
+            finished_at=None
+        )
+        self.message_user(request, f'{updated} job-uri reprogramate.')
+
+    def has_add_permission(self, request):
+        return False
\ No newline at end of file
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class PorscheAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'porsche_app'
\ No newline at end of file
+    name = 'porsche_app'
+
+    def ready(self):
+        from . import signals, tasks  # noqa: F401 - înregistrează semnalele și job-urile
\ No newline at end of file
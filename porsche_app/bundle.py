@@ -0,0 +1,210 @@
+import hashlib
+import io
+import json
+import struct
+import zlib
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from .models import Question, Answer
+
+# Formatul pachetului offline:
+#   MAGIC (4 octeți) | versiune format (u16) | lungime index comprimat (u32)
+#   | index JSON comprimat zlib | blob-uri imagini (thumbnail-uri JPEG lipite)
+# Indexul conține array-uri compacte, iar fiecare întrebare referă
+# thumbnail-ul prin (offset, lungime) în secțiunea de blob-uri.
+# Un pachet delta are același format, cu `base_version` setat: conține doar
+# întrebările noi sau modificate (cu toate răspunsurile lor) și id-urile șterse.
+BUNDLE_MAGIC = b'PQB1'
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_HEADER = struct.Struct('>4sHI')
+BUNDLE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Versiunea curentă e invalidată de semnalele Question/Answer (vezi signals.py);
+# timeout-ul acoperă modificările făcute fără semnale (update(), SQL direct).
+VERSION_CACHE_KEY = 'quiz_bundle:version'
+VERSION_CACHE_TIMEOUT = 60 * 10
+
+THUMBNAIL_SIZE = (320, 320)
+
+
+def content_version():
+    """Versiunea curentă a băncii de întrebări, din cache când este posibil"""
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = refresh_content_version()
+    return version
+
+
+def refresh_content_version():
+    """Recalculează versiunea din baza de date și o pune în cache"""
+    version = compute_content_version()
+    cache.set(VERSION_CACHE_KEY, version, VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def invalidate_content_version():
+    cache.delete(VERSION_CACHE_KEY)
+
+
+def compute_content_version():
+    """Hash-ul conținutului băncii de întrebări (se schimbă doar la modificări)"""
+    digest = hashlib.sha1()
+    digest.update(str(BUNDLE_FORMAT_VERSION).encode())
+
+    questions = Question.objects.order_by('id').values_list(
+        'id', 'text', 'points', 'category', 'image'
+    )
+    for row in questions:
+        digest.update(repr(row).encode('utf-8'))
+
+    answers = Answer.objects.order_by('id').values_list(
+        'id', 'question_id', 'text', 'is_correct'
+    )
+    for row in answers:
+        digest.update(repr(row).encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+def make_thumbnail(image_field):
+    """Generează un thumbnail JPEG mic; întoarce b'' dacă imaginea lipsește"""
+    if not image_field:
+        return b''
+
+    try:
+        from PIL import Image
+
+        with image_field.open('rb') as source:
+            image = Image.open(source)
+            image.thumbnail(THUMBNAIL_SIZE)
+            output = io.BytesIO()
+            image.convert('RGB').save(output, format='JPEG', quality=70, optimize=True)
+            return output.getvalue()
+    except (OSError, ValueError):
+        return b''
+
+
+def build_bundle(version=None):
+    """Construiește pachetul binar cu toate întrebările, răspunsurile și imaginile"""
+    version = version or content_version()
+    category_choices = Question._meta.get_field('category').choices
+    category_index = {key: i for i, (key, label) in enumerate(category_choices)}
+
+    questions = []
+    answers = []
+    blobs = io.BytesIO()
+
+    for question in Question.objects.order_by('id').prefetch_related(
+        Prefetch('answers', queryset=Answer.objects.order_by('id'))
+    ):
+        thumbnail = make_thumbnail(question.image)
+        offset = blobs.tell()
+        blobs.write(thumbnail)
+
+        questions.append([
+            question.id,
+            question.text,
+            question.points,
+            category_index.get(question.category, -1),
+            offset,
+            len(thumbnail),
+        ])
+        for answer in question.answers.all():
+            answers.append([answer.id, question.id, answer.text, int(answer.is_correct)])
+
+    return pack_bundle({
+        'content_version': version,
+        'base_version': None,
+        'categories': [[key, str(label)] for key, label in category_choices],
+        'questions': questions,
+        'answers': answers,
+        'removed': [],
+    }, blobs.getvalue())
+
+
+def pack_bundle(index, blobs):
+    packed_index = zlib.compress(
+        json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 9
+    )
+    header = BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_FORMAT_VERSION, len(packed_index))
+    return header + packed_index + blobs
+
+
+def _bundle_entries(data):
+    """Întrebările unui pachet: id -> (rând fără offset, thumbnail, răspunsuri)"""
+    index, blobs = read_bundle(data)
+    answers = {}
+    for answer in index['answers']:
+        answers.setdefault(answer[1], []).append(answer)
+
+    entries = {}
+    for question in index['questions']:
+        offset, length = question[4], question[5]
+        entries[question[0]] = (question[:4], blobs[offset:offset + length], answers.get(question[0], []))
+    return index, entries
+
+
+def build_delta(base_data, data):
+    """Pachetul cu diferențele dintre două versiuni complete ale băncii"""
+    base_index, base_entries = _bundle_entries(base_data)
+    index, entries = _bundle_entries(data)
+
+    questions = []
+    answers = []
+    blobs = io.BytesIO()
+    for question_id, entry in entries.items():
+        if base_entries.get(question_id) == entry:
+            continue
+        row, thumbnail, question_answers = entry
+        questions.append(row + [blobs.tell(), len(thumbnail)])
+        blobs.write(thumbnail)
+        answers.extend(question_answers)
+
+    return pack_bundle({
+        'content_version': index['content_version'],
+        'base_version': base_index['content_version'],
+        'categories': index['categories'],
+        'questions': questions,
+        'answers': answers,
+        'removed': sorted(set(base_entries) - set(entries)),
+    }, blobs.getvalue())
+
+
+def get_bundle(version=None):
+    """Întoarce pachetul din cache, construindu-l doar când s-a schimbat conținutul"""
+    version = version or content_version()
+    cache_key = f'quiz_bundle:{version}'
+
+    data = cache.get(cache_key)
+    if data is None:
+        data = build_bundle(version)
+        cache.set(cache_key, data, BUNDLE_CACHE_TIMEOUT)
+    return data
+
+
+def get_delta(base_version, version=None):
+    """Delta față de `base_version`, sau None dacă pachetul de bază nu mai este în cache"""
+    version = version or content_version()
+    cache_key = f'quiz_bundle:{base_version}:{version}'
+
+    data = cache.get(cache_key)
+    if data is None:
+        base_data = cache.get(f'quiz_bundle:{base_version}')
+        if base_data is None:
+            return None
+        data = build_delta(base_data, get_bundle(version))
+        cache.set(cache_key, data, BUNDLE_CACHE_TIMEOUT)
+    return data
+
+
+def read_bundle(data):
+    """Decodează un pachet: întoarce (index, blob-uri). Folosit la verificări."""
+    magic, format_version, index_length = BUNDLE_HEADER.unpack_from(data)
+    if magic != BUNDLE_MAGIC or format_version != BUNDLE_FORMAT_VERSION:
+        raise ValueError('Pachet de chestionar invalid sau versiune necunoscută')
+
+    start = BUNDLE_HEADER.size
+    index = json.loads(zlib.decompress(data[start:start + index_length]).decode('utf-8'))
+    return index, data[start + index_length:]
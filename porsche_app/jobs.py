@@ -0,0 +1,145 @@
+import logging
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+# Registrul funcțiilor care pot rula în fundal: nume -> funcție(**payload)
+JOB_HANDLERS = {}
+
+RETRY_DELAY = timedelta(seconds=30)
+JOB_TIMEOUT = timedelta(minutes=10)
+
+
+def job(name):
+    """Decorator: înregistrează o funcție ca job de fundal"""
+    def decorator(func):
+        JOB_HANDLERS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, unique=False, **payload):
+    """Adaugă un job în coadă după commit-ul tranzacției curente"""
+    def create():
+        if unique and BackgroundJob.objects.filter(
+            name=name, payload=payload, status=BackgroundJob.STATUS_PENDING
+        ).exists():
+            return
+        BackgroundJob.objects.create(
+            name=name,
+            payload=payload,
+            max_attempts=getattr(settings, 'BACKGROUND_JOBS_MAX_ATTEMPTS', 3)
+        )
+
+    transaction.on_commit(create)
+
+
+def claim_jobs(limit):
+    """Rezervă până la `limit` job-uri gata de rulare (inclusiv cele blocate de un worker oprit)"""
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        jobs = (
+            BackgroundJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=BackgroundJob.STATUS_PENDING, run_after__lte=now)
+                | Q(status=BackgroundJob.STATUS_RUNNING, locked_at__lt=now - JOB_TIMEOUT)
+            )
+            .order_by('run_after', 'id')[:limit]
+        )
+        for background_job in jobs:
+            if background_job.attempts >= background_job.max_attempts:
+                # Job blocat care și-a consumat încercările: nu îl mai rulăm încă o dată
+                background_job.status = BackgroundJob.STATUS_FAILED
+                background_job.last_error = 'Job-ul a depășit timpul maxim de execuție'
+                background_job.locked_at = None
+                background_job.finished_at = now
+                background_job.save(update_fields=['status', 'last_error', 'locked_at', 'finished_at'])
+                continue
+
+            background_job.status = BackgroundJob.STATUS_RUNNING
+            background_job.locked_at = now
+            background_job.attempts += 1
+            background_job.save(update_fields=['status', 'locked_at', 'attempts'])
+            claimed.append(background_job)
+    return claimed
+
+
+def run_job(background_job):
+    """Execută un job și salvează rezultatul sau programează o nouă încercare"""
+    try:
+        handler = JOB_HANDLERS[background_job.name]
+        background_job.result = handler(**background_job.payload)
+        background_job.status = BackgroundJob.STATUS_DONE
+        background_job.last_error = ''
+        background_job.finished_at = timezone.now()
+    except Exception:
+        logger.exception('Job-ul %s a eșuat', background_job)
+        background_job.last_error = traceback.format_exc()
+        if background_job.attempts < background_job.max_attempts:
+            background_job.status = BackgroundJob.STATUS_PENDING
+            background_job.run_after = timezone.now() + RETRY_DELAY * (2 ** (background_job.attempts - 1))
+        else:
+            background_job.status = BackgroundJob.STATUS_FAILED
+            background_job.finished_at = timezone.now()
+    finally:
+        # Dacă job-ul a fost între timp preluat din nou (timeout), rezultatul acestei
+        # rulări nu mai suprascrie starea celei noi.
+        BackgroundJob.objects.filter(pk=background_job.pk, locked_at=background_job.locked_at).update(
+            status=background_job.status,
+            result=background_job.result,
+            last_error=background_job.last_error,
+            run_after=background_job.run_after,
+            finished_at=background_job.finished_at,
+            locked_at=None
+        )
+        background_job.locked_at = None
+    return background_job
+
+
+def _run_in_thread(background_job):
+    close_old_connections()
+    try:
+        return run_job(background_job)
+    finally:
+        # Conexiunile sunt per thread; nu lăsăm conexiuni deschise în thread-urile inactive
+        connections.close_all()
+
+
+def run_worker(concurrency=None, poll_interval=2.0, once=False):
+    """Rulează job-uri cu cel mult `concurrency` în paralel, preluând altele pe măsură ce
+    se eliberează locuri. Cu `once=True` se oprește când coada este goală.
+    Întoarce numărul de job-uri rulate.
+    """
+    concurrency = concurrency or getattr(settings, 'BACKGROUND_JOBS_CONCURRENCY', 2)
+    processed = 0
+    running = set()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while True:
+            close_old_connections()
+            free_slots = concurrency - len(running)
+            if free_slots:
+                jobs = claim_jobs(free_slots)
+                running.update(executor.submit(_run_in_thread, background_job) for background_job in jobs)
+                processed += len(jobs)
+
+            if running:
+                done, running = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception():
+                        logger.error('Eroare în worker', exc_info=future.exception())
+            elif once:
+                break
+            else:
+                time.sleep(poll_interval)
+    return processed
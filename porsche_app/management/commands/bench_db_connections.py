@@ -0,0 +1,76 @@
+import time
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    help = 'Compară latența unui request cu CONN_MAX_AGE = 0 vs. valoarea configurată'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100)
+        parser.add_argument('--path', default=None,
+                            help='URL-ul cerut (implicit pagina de memes)')
+        parser.add_argument('--username', default=None,
+                            help='Utilizatorul autentificat (implicit primul superuser)')
+
+    def set_conn_max_age(self, max_ages):
+        # CONN_MAX_AGE se citește din settings_dict la deschiderea conexiunii
+        # (override_settings nu ajunge la conexiunile existente), așa că îl
+        # schimbăm direct și închidem conexiunile deschise.
+        for connection in connections.all():
+            connection.settings_dict['CONN_MAX_AGE'] = max_ages[connection.alias]
+            connection.close()
+
+    def run(self, handler, environ, iterations):
+        # WSGIHandler trimite request_started / request_finished, deci conexiunile sunt
+        # închise sau păstrate exact ca într-un request real (spre deosebire de Client).
+        start = time.perf_counter()
+        for _ in range(iterations):
+            status = []
+            response = handler(dict(environ), lambda s, headers, exc_info=None: status.append(s))
+            for _chunk in response:
+                pass
+            response.close()
+            if not status[0].startswith('200'):
+                raise CommandError(f"Request-ul a întors {status[0]}")
+        return (time.perf_counter() - start) / iterations * 1000
+
+    def handle(self, *args, **options):
+        if options['username']:
+            user = User.objects.filter(username=options['username']).first()
+        else:
+            user = User.objects.filter(is_superuser=True).order_by('id').first()
+        if user is None:
+            raise CommandError('Nu există utilizatorul pentru benchmark (folosește --username)')
+
+        client = Client()
+        client.force_login(user)
+        environ = {
+            'PATH_INFO': options['path'] or reverse('memes'),
+            'HTTP_COOKIE': f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}",
+        }
+        setup_testing_defaults(environ)
+
+        configured = {connection.alias: connection.settings_dict['CONN_MAX_AGE'] for connection in connections.all()}
+        handler = WSGIHandler()
+        iterations = options['iterations']
+        try:
+            self.set_conn_max_age({alias: 0 for alias in configured})
+            fresh = self.run(handler, environ, iterations)
+            self.set_conn_max_age(configured)
+            persistent = self.run(handler, environ, iterations)
+        finally:
+            self.set_conn_max_age(configured)
+            client.logout()
+
+        self.stdout.write(f"{environ['PATH_INFO']}, {iterations} request-uri, baze de date: {configured}")
+        self.stdout.write(f"CONN_MAX_AGE = 0:          {fresh:.3f} ms / request")
+        self.stdout.write(f"CONN_MAX_AGE configurat:   {persistent:.3f} ms / request")
+        self.stdout.write(self.style.SUCCESS(f"Timp de conectare eliminat: {fresh - persistent:.3f} ms / request"))
@@ -0,0 +1,28 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from porsche_app.bundle import content_version, get_bundle, read_bundle
+
+
+class Command(BaseCommand):
+    help = 'Exportă banca de întrebări într-un pachet binar pentru chestionare offline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', nargs='?', default='quiz_bundle.pqb',
+                            help='Fișierul în care se scrie pachetul')
+
+    def handle(self, *args, **options):
+        version = content_version()
+        data = get_bundle(version)
+        index, blobs = read_bundle(data)
+
+        output = options['output']
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'wb') as f:
+            f.write(data)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Pachet exportat în {output}: {len(index['questions'])} întrebări, "
+            f"{len(index['answers'])} răspunsuri, {len(data)} octeți (versiune {version[:12]})"
+        ))
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from porsche_app.jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = 'Rulează job-urile de fundal din coadă (thumbnail-uri, PDF-uri, reindexare)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=settings.BACKGROUND_JOBS_CONCURRENCY,
+                            help='Numărul maxim de job-uri rulate în paralel')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Secunde de așteptare când coada este goală')
+        parser.add_argument('--once', action='store_true',
+                            help='Golește coada o dată și se oprește')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Worker pornit (concurență {options['concurrency']})")
+        try:
+            processed = run_worker(options['concurrency'], options['interval'], once=options['once'])
+            self.stdout.write(f'{processed} job-uri procesate')
+        except KeyboardInterrupt:
+            self.stdout.write('Worker oprit')
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('porsche_app', '0004_quizattempt_client_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meme',
+            name='thumbnail',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
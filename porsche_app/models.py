@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.utils import timezone
 
 class Course(models.Model):
     title = models.CharField(max_length=200)
@@ -23,11 +25,26 @@ class Course(models.Model):
 class Meme(models.Model):
     title = models.CharField(max_length=200)
     image = models.ImageField(upload_to='memes/')
+    # Setat de job-ul de thumbnail (tasks.py) după ce fișierul a fost generat
+    thumbnail = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return self.title
 
+    def thumbnail_path(self):
+        """Calea thumbnail-ului pentru imaginea curentă (se schimbă odată cu imaginea)"""
+        return f'thumbs/{self.image.name}.jpg'
+
+    def has_current_thumbnail(self):
+        return bool(self.image) and self.thumbnail == self.thumbnail_path()
+
+    def thumbnail_url(self):
+        """Thumbnail-ul imaginii curente; imaginea originală până la generarea lui"""
+        if self.has_current_thumbnail():
+            return default_storage.url(self.thumbnail)
+        return self.image.url
+
 class Question(models.Model):
     text = models.TextField()
     image = models.ImageField(upload_to='questions/', blank=True, null=True)
@@ -56,12 +73,47 @@ class QuizAttempt(models.Model):
     total_questions = models.IntegerField()
     completed_at = models.DateTimeField(auto_now_add=True)
     category = models.CharField(max_length=50, default='general')
+    # Id generat de client pentru chestionarele rezolvate offline (sincronizare idempotentă)
+    client_id = models.CharField(max_length=64, null=True, blank=True)
 
     class Meta:
         ordering = ['-completed_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'client_id'], name='unique_quizattempt_client_id')
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.score}/{self.total_questions} ({self.category})"
 
     def has_pdf(self):  # ✅ ADAUGĂ METODA ASTA
-        return bool(self.pdf_file)
\ No newline at end of file
+        return bool(self.pdf_file)
+
+class BackgroundJob(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=[
+        (STATUS_PENDING, 'În așteptare'),
+        (STATUS_RUNNING, 'În execuție'),
+        (STATUS_DONE, 'Finalizat'),
+        (STATUS_FAILED, 'Eșuat')
+    ], default=STATUS_PENDING)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
@@ -0,0 +1,39 @@
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import connections
+
+_use_replica = ContextVar('use_replica', default=False)
+
+REPLICA_ALIAS = 'replica'
+
+
+def replica_configured():
+    return REPLICA_ALIAS in connections.databases
+
+
+def use_read_replica(view_func):
+    """Decorator: citirile din view merg pe replica, dacă este configurată"""
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        token = _use_replica.set(True)
+        try:
+            return view_func(*args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+    return wrapper
+
+
+class ReadReplicaRouter:
+    """Trimite citirile pe replica doar în view-urile marcate cu use_read_replica"""
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and replica_configured():
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
@@ -0,0 +1,44 @@
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .bundle import invalidate_content_version
+from .jobs import enqueue
+from .models import Answer, Course, Meme, Question
+
+
+@receiver(post_save, sender=Meme)
+def meme_saved(sender, instance, **kwargs):
+    if instance.has_current_thumbnail():
+        return
+
+    if instance.thumbnail:
+        # Imaginea a fost înlocuită: thumbnail-ul vechi nu mai este afișat, îl ștergem
+        stale = instance.thumbnail
+        Meme.objects.filter(id=instance.id, thumbnail=stale).update(thumbnail='')
+        instance.thumbnail = ''
+        transaction.on_commit(lambda: default_storage.delete(stale))
+
+    if instance.image:
+        enqueue('memes.thumbnail', unique=True, meme_id=instance.id)
+
+
+@receiver(post_delete, sender=Meme)
+def meme_deleted(sender, instance, **kwargs):
+    if instance.thumbnail:
+        path = instance.thumbnail
+        transaction.on_commit(lambda: default_storage.delete(path))
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, **kwargs):
+    if instance.pdf_file:
+        enqueue('courses.process_pdf', unique=True, course_id=instance.id)
+
+
+@receiver([post_save, post_delete], sender=Question)
+@receiver([post_save, post_delete], sender=Answer)
+def quiz_changed(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_content_version)
+    enqueue('quiz.reindex', unique=True)
@@ -0,0 +1,54 @@
+import re
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .bundle import get_bundle, make_thumbnail, refresh_content_version
+from .jobs import job
+from .models import Course, Meme
+
+PDF_PAGE_PATTERN = re.compile(rb'/Type\s*/Page(?!s)')
+
+
+@job('memes.thumbnail')
+def generate_meme_thumbnail(meme_id):
+    """Generează thumbnail-ul afișat în pagina de memes"""
+    meme = Meme.objects.filter(id=meme_id).first()
+    if meme is None:
+        return {'skipped': 'deleted'}
+    thumbnail = make_thumbnail(meme.image)
+    if not thumbnail:
+        raise ValueError(f'Imaginea pentru meme-ul {meme_id} nu poate fi citită')
+
+    path = meme.thumbnail_path()
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    saved = default_storage.save(path, ContentFile(thumbnail))
+    # Doar dacă imaginea nu s-a schimbat între timp
+    if not Meme.objects.filter(id=meme_id, image=meme.image.name).update(thumbnail=saved):
+        default_storage.delete(saved)
+        return {'skipped': 'image changed'}
+    return {'thumbnail': saved}
+
+
+@job('courses.process_pdf')
+def process_course_pdf(course_id):
+    """Verifică PDF-ul unui curs și numără paginile"""
+    course = Course.objects.filter(id=course_id).first()
+    if course is None:
+        return {'skipped': 'deleted'}
+    if not course.pdf_file:
+        return {'skipped': 'no pdf'}
+    with course.pdf_file.open('rb') as f:
+        data = f.read()
+
+    if not data.startswith(b'%PDF'):
+        raise ValueError(f'Fișierul {course.pdf_file.name} nu este un PDF valid')
+    return {'pages': len(PDF_PAGE_PATTERN.findall(data)), 'size': len(data)}
+
+
+@job('quiz.reindex')
+def reindex_quiz_bundle():
+    """Reconstruiește pachetul offline în cache-ul partajat, înaintea primului request"""
+    version = refresh_content_version()
+    return {'content_version': version, 'size': len(get_bundle(version))}
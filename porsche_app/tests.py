@@ -1,3 +1,460 @@
-from django.test import TestCase
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest.mock import patch
 
-# Create your tests here.
+from PIL import Image
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import router as db_router
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .bundle import VERSION_CACHE_KEY, build_bundle, content_version, read_bundle
+from .jobs import JOB_TIMEOUT, claim_jobs, enqueue, run_job, run_worker
+from .models import BackgroundJob, Course, Meme, Question, Answer, QuizAttempt
+from .routers import ReadReplicaRouter, use_read_replica
+from .tasks import generate_meme_thumbnail, process_course_pdf, reindex_quiz_bundle
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def make_image_file(name='imagine.png', size=(800, 600), color='red'):
+    output = io.BytesIO()
+    Image.new('RGB', size, color).save(output, format='PNG')
+    return SimpleUploadedFile(name, output.getvalue(), content_type='image/png')
+
+
+def use_temp_media_root(testcase):
+    media_root = tempfile.mkdtemp()
+    testcase.addCleanup(shutil.rmtree, media_root)
+    media_override = override_settings(MEDIA_ROOT=media_root)
+    media_override.enable()
+    testcase.addCleanup(media_override.disable)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class QuizBundleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        use_temp_media_root(self)
+
+        self.user = User.objects.create_user('student', password='parola-sigura-123')
+        self.client.force_login(self.user)
+
+        self.question = Question.objects.create(text='Ce indică semnul?', points=2, category='signs',
+                                                image=make_image_file())
+        self.answer = Answer.objects.create(question=self.question, text='Stop', is_correct=True)
+        self.other = Question.objects.create(text='Cine are prioritate?')
+
+    def change_bank(self, func):
+        with self.captureOnCommitCallbacks(execute=True):
+            func()
+
+    def test_bundle_round_trip(self):
+        index, blobs = read_bundle(build_bundle())
+
+        self.assertIsNone(index['base_version'])
+        self.assertEqual(index['content_version'], content_version())
+        question = index['questions'][0]
+        self.assertEqual(question[:3], [self.question.id, 'Ce indică semnul?', 2])
+        self.assertEqual(index['categories'][question[3]][0], 'signs')
+        self.assertEqual(index['answers'], [[self.answer.id, self.question.id, 'Stop', 1]])
+        self.assertEqual(index['questions'][1][5], 0)
+
+        thumbnail = Image.open(io.BytesIO(blobs[question[4]:question[4] + question[5]]))
+        self.assertEqual(thumbnail.format, 'JPEG')
+        self.assertLessEqual(max(thumbnail.size), 320)
+
+    def test_unchanged_bank_returns_304_without_hashing(self):
+        response = self.client.get(reverse('quiz_bundle'))
+        self.assertEqual(response.status_code, 200)
+
+        with patch('porsche_app.bundle.compute_content_version') as compute:
+            response = self.client.get(reverse('quiz_bundle'), HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(response.status_code, 304)
+        compute.assert_not_called()
+
+    def test_change_invalidates_version(self):
+        etag = self.client.get(reverse('quiz_bundle'))['ETag']
+
+        self.change_bank(lambda: Answer.objects.create(question=self.other, text='Eu'))
+        response = self.client.get(reverse('quiz_bundle'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_delta_contains_only_changes(self):
+        base_version = content_version()
+        removed_id = self.question.id
+        self.client.get(reverse('quiz_bundle'))
+
+        def change():
+            self.other.text = 'Cine trece primul?'
+            self.other.save()
+            self.question.delete()
+        self.change_bank(change)
+
+        response = self.client.get(reverse('quiz_bundle'), {'since': base_version})
+        index, blobs = read_bundle(response.content)
+
+        self.assertEqual(index['base_version'], base_version)
+        self.assertEqual(index['content_version'], content_version())
+        self.assertEqual([q[:2] for q in index['questions']], [[self.other.id, 'Cine trece primul?']])
+        self.assertEqual(index['removed'], [removed_id])
+        self.assertEqual(blobs, b'')
+
+    def test_reindex_job_prepares_bundle_for_web_requests(self):
+        self.change_bank(lambda: Answer.objects.create(question=self.other, text='Eu'))
+        # Simulează o versiune veche rămasă în cache (ex. calculată înaintea commit-ului)
+        cache.set(VERSION_CACHE_KEY, '0' * 40)
+
+        result = reindex_quiz_bundle()
+
+        with patch('porsche_app.bundle.build_bundle') as build:
+            response = self.client.get(reverse('quiz_bundle'))
+        build.assert_not_called()
+        self.assertEqual(response['ETag'], f'"{result["content_version"]}"')
+        self.assertEqual(len(response.content), result['size'])
+
+    def test_unknown_base_version_returns_full_bundle(self):
+        response = self.client.get(reverse('quiz_bundle'), {'since': '0' * 40})
+        index, blobs = read_bundle(response.content)
+
+        self.assertIsNone(index['base_version'])
+        self.assertEqual(len(index['questions']), 2)
+
+
+class QuizSyncTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('student', password='parola-sigura-123')
+        self.client.force_login(self.user)
+
+        self.question = Question.objects.create(text='Cine are prioritate?', points=2)
+        self.wrong = Answer.objects.create(question=self.question, text='Eu')
+        self.correct = Answer.objects.create(question=self.question, text='Tramvaiul', is_correct=True)
+
+    def sync(self, attempts):
+        return self.client.post(reverse('quiz_sync'), json.dumps({'attempts': attempts}),
+                                content_type='application/json')
+
+    def test_percentage_uses_points(self):
+        response = self.sync([{'id': 'a1', 'answers': {str(self.question.id): self.correct.id}}])
+
+        self.assertEqual(response.status_code, 200)
+        result = response.json()['results'][0]
+        self.assertEqual(result['score'], 2)
+        self.assertEqual(result['max_score'], 2)
+        self.assertEqual(result['percentage'], 100)
+
+    def test_wrong_answer_or_foreign_answer_scores_zero(self):
+        other = Question.objects.create(text='Altă întrebare')
+        other_correct = Answer.objects.create(question=other, text='Da', is_correct=True)
+
+        response = self.sync([
+            {'id': 'a1', 'answers': {str(self.question.id): self.wrong.id}},
+            {'id': 'a2', 'answers': {str(self.question.id): other_correct.id}},
+        ])
+
+        self.assertEqual([r['score'] for r in response.json()['results']], [0, 0])
+
+    def test_resent_batch_is_not_duplicated(self):
+        attempts = [{'id': 'a1', 'answers': {str(self.question.id): self.correct.id}}]
+
+        self.sync(attempts)
+        response = self.sync(attempts)
+
+        self.assertEqual(response.json()['synced'], 0)
+        self.assertEqual(response.json()['duplicates'], ['a1'])
+        self.assertEqual(QuizAttempt.objects.filter(user=self.user).count(), 1)
+
+    def test_deleted_questions_are_not_counted(self):
+        deleted = Question.objects.create(text='Întrebare ștearsă', points=5)
+        deleted_answer = Answer.objects.create(question=deleted, text='Da', is_correct=True)
+        deleted_ids = (str(deleted.id), deleted_answer.id)
+        deleted.delete()
+
+        response = self.sync([
+            {'id': 'a1', 'answers': {str(self.question.id): self.correct.id, deleted_ids[0]: deleted_ids[1]}},
+            {'id': 'a2', 'answers': {deleted_ids[0]: deleted_ids[1]}},
+        ])
+
+        data = response.json()
+        self.assertEqual(data['synced'], 1)
+        self.assertEqual(data['rejected'], ['a2'])
+        self.assertEqual(data['results'][0]['total_questions'], 1)
+        self.assertEqual(data['results'][0]['percentage'], 100)
+        attempt = QuizAttempt.objects.get(user=self.user)
+        self.assertEqual((attempt.client_id, attempt.score, attempt.total_questions), ('a1', 2, 1))
+
+    def test_invalid_payloads_are_rejected(self):
+        answers = {str(self.question.id): self.correct.id}
+        invalid = [
+            [{'answers': answers}],
+            [{'id': '', 'answers': answers}],
+            [{'id': 'a1', 'answers': {str(self.question.id): 10 ** 30}}],
+            [{'id': 'a1', 'answers': {'-1': self.correct.id}}],
+        ]
+        for attempts in invalid:
+            with self.subTest(attempts=attempts):
+                self.assertEqual(self.sync(attempts).status_code, 400)
+        self.assertFalse(QuizAttempt.objects.exists())
+
+
+@patch('porsche_app.routers.replica_configured', return_value=True)
+class ReadReplicaRouterTests(SimpleTestCase):
+    def test_reads_use_replica_only_inside_decorated_view(self, configured):
+        router = ReadReplicaRouter()
+        decorated = use_read_replica(lambda: (router.db_for_read(Meme), router.db_for_write(Meme)))
+
+        self.assertEqual(decorated(), ('replica', 'default'))
+        self.assertIsNone(router.db_for_read(Meme))
+
+    def test_without_replica_reads_use_default(self, configured):
+        configured.return_value = False
+        router = ReadReplicaRouter()
+
+        self.assertIsNone(use_read_replica(lambda: router.db_for_read(Meme))())
+
+    def test_replica_can_be_migrated(self, configured):
+        self.assertTrue(db_router.allow_migrate('replica', 'porsche_app', model_name='meme'))
+
+
+@patch('porsche_app.routers.replica_configured', return_value=True)
+class ReadReplicaViewTests(TestCase):
+    """Înregistrează unde ar merge fiecare citire, dar execută interogările pe default"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('student', password='parola-sigura-123')
+        self.client.force_login(self.user)
+        self.course = Course.objects.create(title='Depășirea', content='...')
+
+    def get_routes(self, url):
+        routes = []
+        db_for_read = ReadReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            routes.append((model, db_for_read(router, model, **hints)))
+            return None
+
+        with patch.object(ReadReplicaRouter, 'db_for_read', spy):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return routes
+
+    def test_read_only_views_read_from_replica(self, configured):
+        views = [
+            (reverse('course_detail', args=[self.course.id]), Course),
+            (reverse('memes'), Meme),
+            (reverse('quiz_history'), QuizAttempt),
+        ]
+        for url, model in views:
+            with self.subTest(url=url):
+                routes = self.get_routes(url)
+                self.assertIn((model, 'replica'), routes)
+                # Sesiunea și utilizatorul sunt citite de middleware, înaintea view-ului
+                self.assertIn((User, None), routes)
+
+    def test_other_views_read_from_default(self, configured):
+        routes = self.get_routes(reverse('home'))
+
+        self.assertIn((Course, None), routes)
+        self.assertNotIn('replica', [db for model, db in routes])
+
+
+def failing_job():
+    raise RuntimeError('fișier indisponibil')
+
+
+@patch.dict('porsche_app.jobs.JOB_HANDLERS', {'test.ok': lambda **payload: payload, 'test.fail': failing_job})
+class BackgroundJobTests(TestCase):
+    def run_next(self):
+        jobs = claim_jobs(1)
+        self.assertEqual(len(jobs), 1)
+        if jobs[0].name != 'test.fail':
+            return run_job(jobs[0])
+        with self.assertLogs('porsche_app.jobs', 'ERROR'):
+            return run_job(jobs[0])
+
+    def test_enqueue_waits_for_commit_and_skips_pending_duplicates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue('test.ok', unique=True, course_id=1)
+            self.assertFalse(BackgroundJob.objects.exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue('test.ok', unique=True, course_id=1)
+            enqueue('test.ok', unique=True, course_id=2)
+            enqueue('test.ok', course_id=2)
+
+        payloads = BackgroundJob.objects.order_by('id').values_list('payload', flat=True)
+        self.assertEqual(list(payloads), [{'course_id': 1}, {'course_id': 2}, {'course_id': 2}])
+
+    def test_successful_job_stores_result(self):
+        BackgroundJob.objects.create(name='test.ok', payload={'pages': 3})
+
+        self.run_next()
+
+        background_job = BackgroundJob.objects.get()
+        self.assertEqual(background_job.status, BackgroundJob.STATUS_DONE)
+        self.assertEqual(background_job.result, {'pages': 3})
+        self.assertIsNone(background_job.locked_at)
+
+    def test_failed_job_is_retried_with_backoff_then_fails(self):
+        background_job = BackgroundJob.objects.create(name='test.fail', max_attempts=3)
+
+        delays = []
+        for attempt in range(1, 3):
+            before = timezone.now()
+            self.run_next()
+            background_job.refresh_from_db()
+            self.assertEqual(background_job.status, BackgroundJob.STATUS_PENDING)
+            self.assertEqual(background_job.attempts, attempt)
+            self.assertIn('fișier indisponibil', background_job.last_error)
+            delays.append(round((background_job.run_after - before).total_seconds()))
+            self.assertEqual(claim_jobs(1), [])
+            BackgroundJob.objects.update(run_after=timezone.now())
+        self.assertEqual(delays, [30, 60])
+
+        self.run_next()
+        background_job.refresh_from_db()
+        self.assertEqual(background_job.status, BackgroundJob.STATUS_FAILED)
+        self.assertEqual(background_job.attempts, 3)
+        self.assertIsNotNone(background_job.finished_at)
+        self.assertEqual(claim_jobs(1), [])
+
+    def test_stale_running_job_is_reclaimed(self):
+        stale = timezone.now() - JOB_TIMEOUT - timedelta(minutes=1)
+        BackgroundJob.objects.create(name='test.ok', status=BackgroundJob.STATUS_RUNNING,
+                                     attempts=1, locked_at=stale)
+
+        background_job = self.run_next()
+
+        self.assertEqual(background_job.attempts, 2)
+        self.assertEqual(background_job.status, BackgroundJob.STATUS_DONE)
+
+    def test_stale_job_without_attempts_left_is_failed_not_rerun(self):
+        stale = timezone.now() - JOB_TIMEOUT - timedelta(minutes=1)
+        background_job = BackgroundJob.objects.create(name='test.ok', status=BackgroundJob.STATUS_RUNNING,
+                                                      attempts=3, max_attempts=3, locked_at=stale)
+
+        self.assertEqual(claim_jobs(1), [])
+
+        background_job.refresh_from_db()
+        self.assertEqual(background_job.status, BackgroundJob.STATUS_FAILED)
+        self.assertEqual(background_job.attempts, 3)
+
+    def test_reclaimed_job_is_not_overwritten_by_old_run(self):
+        BackgroundJob.objects.create(name='test.ok')
+        old_run = claim_jobs(1)[0]
+        BackgroundJob.objects.update(locked_at=timezone.now() + timedelta(seconds=1))
+
+        run_job(old_run)
+
+        self.assertEqual(BackgroundJob.objects.get().status, BackgroundJob.STATUS_RUNNING)
+
+
+class BackgroundTaskTests(TestCase):
+    def setUp(self):
+        use_temp_media_root(self)
+        self.user = User.objects.create_user('student', password='parola-sigura-123')
+        self.client.force_login(self.user)
+
+    def test_meme_thumbnail_is_served_and_removed_with_meme(self):
+        meme = Meme.objects.create(title='Meme', image=make_image_file())
+        original_url = meme.image.url
+        self.assertEqual(meme.thumbnail_url(), original_url)
+
+        result = generate_meme_thumbnail(meme.id)
+
+        self.assertTrue(default_storage.exists(result['thumbnail']))
+        with patch.object(default_storage, 'exists') as exists:
+            response = self.client.get(reverse('memes'))
+        exists.assert_not_called()
+        self.assertContains(response, default_storage.url(result['thumbnail']))
+        self.assertContains(response, f'href="{original_url}"')
+
+        meme.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            meme.delete()
+        self.assertFalse(default_storage.exists(result['thumbnail']))
+
+    def test_replaced_image_does_not_show_old_thumbnail(self):
+        meme = Meme.objects.create(title='Meme', image=make_image_file('rosu.png'))
+        old_thumbnail = generate_meme_thumbnail(meme.id)['thumbnail']
+
+        meme.refresh_from_db()
+        meme.image = make_image_file('albastru.png', color='blue')
+        with self.captureOnCommitCallbacks(execute=True):
+            meme.save()
+
+        response = self.client.get(reverse('memes'))
+        self.assertContains(response, f'src="{meme.image.url}"')
+        self.assertNotContains(response, default_storage.url(old_thumbnail))
+        self.assertFalse(default_storage.exists(old_thumbnail))
+        self.assertTrue(BackgroundJob.objects.filter(name='memes.thumbnail', status='pending').exists())
+
+        new_thumbnail = generate_meme_thumbnail(meme.id)['thumbnail']
+        self.assertContains(self.client.get(reverse('memes')), default_storage.url(new_thumbnail))
+        with default_storage.open(new_thumbnail) as f:
+            self.assertGreater(Image.open(f).convert('RGB').getpixel((0, 0))[2], 200)
+
+    def test_thumbnail_for_replaced_image_is_discarded(self):
+        meme = Meme.objects.create(title='Meme', image=make_image_file('rosu.png'))
+
+        def replace_image_meanwhile(image_field):
+            Meme.objects.filter(id=meme.id).update(image='memes/alta.png')
+            return b'jpeg'
+
+        with patch('porsche_app.tasks.make_thumbnail', side_effect=replace_image_meanwhile):
+            result = generate_meme_thumbnail(meme.id)
+
+        self.assertEqual(result, {'skipped': 'image changed'})
+        self.assertFalse(default_storage.exists(meme.thumbnail_path()))
+        meme.refresh_from_db()
+        self.assertEqual(meme.thumbnail, '')
+
+    def test_deleted_rows_are_skipped(self):
+        self.assertEqual(generate_meme_thumbnail(123), {'skipped': 'deleted'})
+        self.assertEqual(process_course_pdf(123), {'skipped': 'deleted'})
+
+    def test_course_pdf_pages_are_counted(self):
+        pdf = b'%PDF-1.4\n1 0 obj << /Type /Pages >>\n2 0 obj << /Type /Page >>\n3 0 obj << /Type/Page >>'
+        course = Course.objects.create(title='Curs', content='...',
+                                       pdf_file=SimpleUploadedFile('curs.pdf', pdf))
+
+        self.assertEqual(process_course_pdf(course.id), {'pages': 2, 'size': len(pdf)})
+
+
+class BackgroundWorkerTests(TransactionTestCase):
+    def test_concurrency_limit_and_free_slots_are_refilled(self):
+        BackgroundJob.objects.create(name='slow')
+        for _ in range(4):
+            BackgroundJob.objects.create(name='fast')
+
+        lock = threading.Lock()
+        active = []
+        max_active = []
+        finished = []
+
+        def fake_run_job(background_job):
+            with lock:
+                active.append(background_job.pk)
+                max_active.append(len(active))
+            time.sleep(0.5 if background_job.name == 'slow' else 0.02)
+            with lock:
+                active.remove(background_job.pk)
+                finished.append(background_job.name)
+
+        with patch('porsche_app.jobs.run_job', fake_run_job):
+            processed = run_worker(concurrency=2, poll_interval=0.01, once=True)
+
+        self.assertEqual(processed, 5)
+        self.assertEqual(max(max_active), 2)
+        # Job-urile rapide nu așteaptă după cel lent: ocupă locul rămas liber
+        self.assertEqual(finished, ['fast'] * 4 + ['slow'])
@@ -9,6 +9,8 @@ urlpatterns = [
     path('logout/', views.custom_logout, name='logout'),
     path('course/<int:course_id>/', views.course_detail, name='course_detail'),
     path('quiz/', views.quiz_view, name='quiz'),
+    path('quiz/bundle/', views.quiz_bundle, name='quiz_bundle'),
+    path('quiz/sync/', views.quiz_sync, name='quiz_sync'),
     path('quiz/history/', views.quiz_history, name='quiz_history'),
     path('profile/', views.profile_view, name='profile'),
 
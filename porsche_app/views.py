@@ -2,10 +2,17 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_GET, require_POST
+import json
 import random
+import re
 
 from .models import Course, Meme, Question, Answer, QuizAttempt
 from .forms import CustomUserCreationForm, QuizForm
+from .bundle import content_version, get_bundle, get_delta
+from .routers import use_read_replica
 
 
 def register_view(request):
@@ -55,6 +62,7 @@ def home_view(request):
 
 
 @login_required
+@use_read_replica
 def course_detail(request, course_id):
     course = Course.objects.get(id=course_id)
     related_courses = Course.objects.exclude(id=course_id).filter(difficulty=course.difficulty)[:3]
@@ -116,7 +124,143 @@ def quiz_view(request):
     })
 
 
+CONTENT_VERSION_PATTERN = re.compile(r'[0-9a-f]{40}')
+
+
+@login_required
+@require_GET
+def quiz_bundle(request):
+    """Pachetul offline cu toate întrebările; 304 dacă clientul are deja versiunea curentă.
+
+    Cu `?since=<versiune>` se trimite doar delta față de acea versiune, dacă mai este
+    disponibilă; altfel pachetul complet (câmpul `base_version` din index le deosebește).
+    """
+    version = content_version()
+    etag = f'"{version}"'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        since = request.GET.get('since', '')
+        data = None
+        if CONTENT_VERSION_PATTERN.fullmatch(since) and since != version:
+            data = get_delta(since, version)
+        if data is None:
+            data = get_bundle(version)
+        response = HttpResponse(data, content_type='application/octet-stream')
+        response['Content-Disposition'] = 'attachment; filename="quiz_bundle.pqb"'
+
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+MAX_SYNC_ATTEMPTS = 100
+MAX_CLIENT_ID_LENGTH = 64
+MAX_OBJECT_ID = 2 ** 63 - 1  # limita BigAutoField
+
+
+def _parse_object_id(value):
+    object_id = int(value)
+    if not 1 <= object_id <= MAX_OBJECT_ID:
+        raise ValueError
+    return object_id
+
+
+@login_required
+@require_POST
+def quiz_sync(request):
+    """Primește într-un singur request chestionarele rezolvate offline.
+
+    Fiecare chestionar are un `id` generat de client; cele deja primite sunt ignorate,
+    așa că un client poate retrimite lotul fără să dubleze rezultatele. Chestionarele
+    care conțin doar întrebări șterse între timp sunt respinse (`rejected`).
+    """
+    try:
+        payload = json.loads(request.body)
+        attempts = payload['attempts']
+        if not isinstance(attempts, list) or len(attempts) > MAX_SYNC_ATTEMPTS:
+            raise ValueError
+        client_ids = []
+        selections = []
+        for attempt in attempts:
+            client_id = attempt['id']
+            if not isinstance(client_id, str) or not 0 < len(client_id) <= MAX_CLIENT_ID_LENGTH:
+                raise ValueError
+            client_ids.append(client_id)
+            selections.append({
+                _parse_object_id(q_id): _parse_object_id(a_id)
+                for q_id, a_id in attempt['answers'].items()
+            })
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return JsonResponse({'error': 'Format invalid pentru sincronizare'}, status=400)
+
+    duplicates = set(QuizAttempt.objects.filter(
+        user=request.user, client_id__in=client_ids
+    ).values_list('client_id', flat=True))
+
+    # Câte o singură interogare pentru toate întrebările și răspunsurile din lot
+    question_ids = {q_id for selection in selections for q_id in selection}
+    answer_ids = {a_id for selection in selections for a_id in selection.values()}
+    points = dict(Question.objects.filter(id__in=question_ids).values_list('id', 'points'))
+    answers = {
+        answer_id: (question_id, is_correct)
+        for answer_id, question_id, is_correct in Answer.objects.filter(
+            id__in=answer_ids
+        ).values_list('id', 'question_id', 'is_correct')
+    }
+
+    new_attempts = []
+    results = []
+    skipped = []
+    rejected = []
+    for attempt, client_id, selection in zip(attempts, client_ids, selections):
+        if client_id in duplicates:
+            skipped.append(client_id)
+            continue
+        duplicates.add(client_id)
+
+        # Întrebările șterse între timp (pachet offline vechi) nu se mai punctează
+        known = {q_id: a_id for q_id, a_id in selection.items() if q_id in points}
+        if not known:
+            rejected.append(client_id)
+            continue
+
+        score = 0
+        max_score = 0
+        for question_id, answer_id in known.items():
+            max_score += points[question_id]
+            if answers.get(answer_id) == (question_id, True):
+                score += points[question_id]
+
+        total_questions = len(known)
+        category = str(attempt.get('category') or 'general')[:50]
+        new_attempts.append(QuizAttempt(
+            user=request.user,
+            score=score,
+            total_questions=total_questions,
+            category=category,
+            client_id=client_id
+        ))
+        results.append({
+            'id': client_id,
+            'score': score,
+            'max_score': max_score,
+            'total_questions': total_questions,
+            'percentage': (score / max_score) * 100 if max_score else 0,
+        })
+
+    # ignore_conflicts acoperă două retrimiteri ale aceluiași lot sosite simultan
+    QuizAttempt.objects.bulk_create(new_attempts, ignore_conflicts=True)
+    return JsonResponse({
+        'synced': len(new_attempts),
+        'duplicates': sorted(set(skipped)),
+        'rejected': rejected,
+        'results': results
+    })
+
+
 @login_required
+@use_read_replica
 def quiz_history(request):
     attempts = QuizAttempt.objects.filter(user=request.user)
     return render(request, 'quiz_history.html', {'attempts': attempts})
@@ -142,6 +286,7 @@ def profile_view(request):
     })
 
 @login_required
+@use_read_replica
 def memes_view(request):
     """Pagina dedicată doar pentru memes"""
     memes = Meme.objects.all().order_by('-created_at')